@@ -0,0 +1,1012 @@
+from util import *
+from config import *
+from constants import *
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#OWN MODULES
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+from scipy.integrate import quad as integrate
+from scipy.integrate import odeint
+from scipy.linalg import norm
+from scipy.special import lambertw
+from scipy.optimize import leastsq
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#STELLAR PROPERTIES
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+def starLXUV(Ls,t):
+    """
+    Stellar XUV Luminosity
+    Ls in LSUN and t in Gyrs (scalars or arrays)
+    """
+    Ls=np.array(Ls,dtype=float)
+    t=np.array(t,dtype=float)
+
+    #==================================================
+    #CRITICAL TIME: Scalo 2007, Khodachenko 2009 Fig.1
+    #==================================================
+    taui=2.03E15*(Ls*1.8)**(-0.65)/(1E9*YEAR)
+
+    #==================================================
+    #X-RAY LUMINOSITY --kilsykova et Lammer 2012
+    #==================================================
+    LX=np.where(t<=taui,6.3E-4*(Ls*LSUN*1E7),1.8928E28*t**(-1.34))
+
+    #==================================================
+    #EUV LUMINOSITY
+    #==================================================
+    LEUV=10**(4.8+0.86*np.log10(LX))
+    LXUV=(LX+LEUV) #/(Ls*4E33)
+    LXUV=LX #/(Ls*4E33)
+    return LXUV[()]
+
+def maxPeriod(M,R):
+    """
+    Maximum period of rotation before disruption
+    """
+    Wmax=(GCONST*M*MSUN/(R*RSUN)**3)**0.5
+    Pmax=2*PI/Wmax
+    return Pmax/DAY
+
+"""
+Taken from Claret & Gimenez (1989, 1990)
+ZAMS values
+"""
+STELLAR_MOI=np.array([
+        [0.020,0.230**1],
+        [0.600,0.378**2],
+        [0.800,0.323**2],
+        [1.000,0.277**2],
+        [1.122,0.248**2],
+        [1.259,0.224**2],
+        ])
+
+def stellarMoI(M,type="Regression"):
+    """
+    #type=Regression,Upper,Lower
+    plt.figure()
+    plt.plot(STELLAR_MOI[:,0],sqrt(STELLAR_MOI[:,1]))
+    plt.savefig("moi.png")
+    print sqrt(stellarMoI(1.5))
+    exit(0)
+    """    
+    #Regression Coefficients (calculated at May.7/2013)
+    a=-1.577705e-01
+    b=2.339366e-01
+    
+    #Lower limit
+    MoIlow=0.076729 #Claret & Gimenez (1989)
+
+    #Upper limit
+    MoIup=0.25 #Leconte et al. (2011)
+    
+    #type="Upper"
+    if type=="Regression":
+        MoI=a*M+b
+    elif type=="Upper":
+        MoI=MoIup
+    else:
+        MoI=MoIlow
+
+    if M>STELLAR_MOI[-1,0]:
+        MoI=STELLAR_MOI[-1,-1]
+
+    return MoI
+
+def XYfromZ(Z):
+    """
+    See: http://stev.oapd.inaf.it/cgi-bin/cmd
+    """
+    Y=0.2485+1.78*Z
+    X=1-Y-Z
+    return X,Y
+
+XSUN,YSUN=XYfromZ(ZSUN)
+
+#METALLICITY FROM Z
+def FeH2Z(FeH,X=0.75,A=1.0):
+    """
+    Values at sun.txt
+    
+    Examples:
+    print FeH2Z(-0.5,X=0.75,A=0.9)
+    print FeH2Z(-0.5,X=0.70,A=1.0)
+    print FeH2Z(-0.5,X=0.75,A=1.0)
+    print FeH2Z(-0.5,X=0.70,A=0.9)
+    """
+    """
+    Wikipedia
+    XSun=0.7110
+    ZSun=0.0149
+    YSun=0.2741
+    """
+    Z=ZSUN*(X/XSUN)*10**(A*FeH)
+    return Z
+
+#CALCULATE Z FROM METALLICITY
+def ZfromFHe(FeH):
+    """
+    Example:
+    print ZfromFHe(-0.55)
+    print ZfromFHe(-0.40)
+    """
+    Xvec=np.linspace(0.700,0.739,100)
+    Avec=np.linspace(0.9,1.0,100)
+    Zvals=[]
+    for X in Xvec:
+        for A in Avec:
+            Zvals+=[FeH2Z(FeH,X=X,A=A)]
+    Z=np.mean(Zvals)
+    dZ=np.std(Zvals)
+    return Z,dZ
+
+def FeHfromZ(Z):
+    func=lambda FeH:ZfromFHe(FeH)[0]-Z
+    FeH=bisectFunction(func,-10.0,10.0)
+    return FeH
+
+def ZfromFHeError(FHe,dFHe):
+    Z1,dZ1=ZfromFHe(FHe-dFHe)
+    #print Z1,dZ1
+    Z2,dZ2=ZfromFHe(FHe+dFHe)
+    #print Z2,dZ2
+    Zmin=min(Z1-dZ1,Z2-dZ2)
+    Zmax=max(Z1+dZ1,Z2+dZ2)
+    #print Zmin,Zmax
+    Zmed=(Zmax+Zmin)/2
+    dZ=(Zmax-Zmin)/2
+    #print Zmed,dZ
+    return Zmed,dZ
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#STELLAR WIND
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+def vn1AUeq(t):
+    """
+    Velocity and density 1 AU equivalent for main sequence stars.  G07.
+
+    Parameter:
+    t: secs (scalar or array)
+
+    Return:
+    Velocity v at 1 AU: m/s
+    Number density n at 1 AU: m^{-3}
+    """
+    vo=3971*KILO #m/s
+    no=1.04E11 #m^{-3}
+    tau=2.56E7*YEAR #secs
+    betav=-0.43
+    betan=-1.86
+
+    ft=(1+t/tau)
+    v=vo*ft**betav #Eq. 6
+    n=no*ft**betan #Eq. 7
+    return v,n
+
+def EqTcorona(Tc,**pars):
+    """
+    Equation to compute corona temperature, G07
+    
+    """
+    M=pars['M']
+    t=pars['t']
+    vref,nref=vn1AUeq(t*GIGA*YEAR)
+    v=VParker(1.0,M,Tc)
+    et=v-vref
+    return et
+
+def EqParker(vn,**pars):
+    """
+    Parker Equation.  G07.
+    """
+    dn=pars['dn']
+    ep=np.log(vn**2.0)-vn**2.0+4*np.log(dn)+4/dn-3 #Eq.3
+    return ep
+
+def parkerLogVelocity(dn):
+    """
+    Logarithm of the normalized velocity vn of the transonic Parker
+    solution at normalized distances dn (array): subsonic for dn<1,
+    supersonic for dn>1.
+
+    EqParker, log(vn^2)-vn^2=C, is solved exactly by
+    vn^2=-W(-exp(C)), with the principal branch of the Lambert W
+    function in the subsonic part and the k=-1 branch in the
+    supersonic part.  log(vn^2)=C-W is used to avoid the underflow of
+    vn close to the star.
+    """
+    dn=np.array(dn,dtype=float)
+    C=-(4*np.log(dn)+4/dn-3)
+    #C<=-1: lambertw FAILS AT AND, BY ROUNDING, BELOW THE BRANCH POINT
+    #W(x)=x FOR TINY x (lambertw FAILS WITH DENORMALS)
+    x=np.where(C>-700,-np.exp(np.maximum(C,-700)),0.0)
+    x=np.maximum(x,np.nextafter(-np.exp(-1),0))
+    W=np.where(dn<1,lambertw(x,0).real,lambertw(x,-1).real)
+    return (C-W)/2
+
+def VParker(d,M,Tc):
+    """
+    Velocity of a Parker stellar wind. G07.
+    
+    Parameters:
+    M: Stellar mass (solar masses)
+    Tc: Corona temperature (K)
+    d: Distance (AU)
+
+    Parameters may be arrays (e.g. a profile at many distances).
+    """
+    M=M*MSUN
+    d=np.array(d,dtype=float)*AU
+    m=MP
+    
+    vc=np.sqrt(KB*Tc/m) #Eq.4
+    dc=m*GCONST*M/(4*KB*Tc) #Eq.5
+    
+    dn=d/dc
+    vn=np.exp(parkerLogVelocity(dn))
+        
+    return (vn*vc)[()]
+
+"""
+Coronal temperature table.
+
+At distance d the velocity of an isothermal Parker wind only depends
+on u=KB Tc d/(m G M):
+
+  v/sqrt(G M/d) = sqrt(u) vn(4u)
+
+so the solution of EqTcorona for any age and mass is obtained by
+inverting this relation, which is tabulated once in log u (d=1 AU).
+"""
+#MAXIMUM RELATIVE ERROR OF THE TABULATED CORONAL TEMPERATURE
+TCORONATOL=1E-6
+#TABULATED RANGE OF u
+TCORONAU=(1E-5,1E6)
+TCTABLE=None
+
+def buildTcoronaTable(tol=TCORONATOL):
+    """
+    Table of log u and log(v/sqrt(G M/d)) (see above).  The grid is
+    refined until the interpolated log u is within tol at the middle
+    points.
+    """
+    nu=1000
+    while True:
+        lnu=np.linspace(np.log(TCORONAU[0]),np.log(TCORONAU[1]),nu)
+        lnF=0.5*lnu+parkerLogVelocity(4*np.exp(lnu))
+        lnum=(lnu[1:]+lnu[:-1])/2
+        lnFm=0.5*lnum+parkerLogVelocity(4*np.exp(lnum))
+        err=np.abs(np.interp(lnFm,lnF,lnu)-lnum).max()
+        if err<tol:break
+        nu*=2
+    return lnu,lnF
+
+def tcoronaTable(cachefile=TCORONACACHE):
+    """
+    Coronal temperature table, read from cachefile when it was built
+    by the same version of the wind model, otherwise built and saved.
+    """
+    global TCTABLE
+    if TCTABLE is not None:return TCTABLE
+    signature=calibrationSignature()
+    if fileexists(cachefile):
+        try:
+            table=np.load(cachefile)
+            if str(table['signature'])==signature and \
+                    float(table['tol'])==TCORONATOL:
+                TCTABLE=table['lnu'],table['lnF']
+                return TCTABLE
+        except Exception:
+            pass
+    TCTABLE=buildTcoronaTable()
+    atomicSave(cachefile,np.savez,signature=signature,tol=TCORONATOL,
+                         lnu=TCTABLE[0],lnF=TCTABLE[1])
+    return TCTABLE
+
+def Tcorona(t,M):
+    """
+    Temperature of Corona, G07.  Solution of EqTcorona interpolated
+    in the coronal temperature table.
+
+    t (Gyr) and M (Msun) may be arrays.  Returns -1 when there is no
+    solution between 1E2 and 1E9 K.
+    """
+    lnu,lnF=tcoronaTable()
+    vref,nref=vn1AUeq(np.array(t,dtype=float)*GIGA*YEAR)
+    vk2=GCONST*np.array(M,dtype=float)*MSUN/AU
+    lnw=np.log(vref/np.sqrt(vk2))
+    Tc=np.exp(np.interp(lnw,lnF,lnu))*MP*vk2/KB
+    valid=(lnw>=lnF[0])&(lnw<=lnF[-1])&(Tc>=1E2)&(Tc<=1E9)
+    return np.where(valid,Tc,-1)[()]
+
+def vnGreissmeier(d,t,M,R):
+    """
+    Velocity and number density computed from Greissmeier model at G07
+    
+    Parameters:
+    d: distance in AU
+    t: time in Gyrs
+    M: Mass in Msun
+    R: Radius in Rsun
+
+    Return:
+    v: Velocity in m/s
+    n: Number density in m^{-3}
+    """
+    #STELLAR RADIUS
+    R=R*RSUN #m
+
+    #REFERENCE VELOCITY AND DENSITY
+    vref,nref=vn1AUeq(t*GIGA*YEAR)
+
+    #SOLAR MASS LOSS RATE AT t
+    dMsun=4*PI*AU**2*nref*vref*MP #Eq. 10
+
+    #SCALED STELLAR MASS LOSS RATE AT t
+    dMstar=scaleProp(R/RSUN,dMsun,2.0) # Eq.11
+
+    #CORONAL TEMPERATURE AT t (ISOTHERMAL MODEL)
+    Tc=Tcorona(t,M)
+
+    #RADIAL VELOCITY
+    vr=VParker(d,M,Tc)
+
+    #NUMBER DENSITY
+    n=dMstar/(4*PI*(d*AU)**2*vr*MP)
+
+    #EFFECTIVE VELOCITY
+    vkep=np.sqrt(GCONST*M*MSUN/(d*AU))
+    v=np.sqrt(vr**2+vkep**2)
+
+    return v,n
+
+def vnGreissmeier2(d,t,M,R,verbose=False,early='constant'):
+    """
+    Velocity and number density computed from Greissmeier model at G07
+    
+    Parameters:
+    d: distance in AU
+    t: time in Gyrs
+    M: Mass in Msun
+    R: Radius in Msun
+
+    Parameters may be arrays (verbose only for scalars).
+
+    Return:
+    v: Velocity in m/s
+    n: Number density in m^{-3}
+    """
+    if verbose:
+        print "Computing stellar wind properties at t=%e:Ms=%e Msun,Rs = %e Rsun,d=%e AU"%(t,M,R,d)
+    if early=='constant':
+        if verbose and t<0.7:print "\tSATURATION!"
+        t=np.maximum(t,0.7)
+    #REFERENCE VELOCITY AND DENSITY
+    vref,nref=vn1AUeq(t*GIGA*YEAR)
+    if verbose:print "\tvref,nref = %e m/s,%e m^-3"%(vref,nref)
+    #SOLAR MASS LOSS RATE AT t
+    dMsun=4*np.pi*AU**2*nref*vref*MP #Eq. 10
+    if verbose:print "\tSolar mass loss: %e kg/s"%dMsun
+    #SCALED STELLAR MASS LOSS RATE AT t
+    dMstar=scaleProp(R,dMsun,2.0) # Eq.11
+    if verbose:print "\tStellar mass loss: %e kg/s (%e Mdot,sun)"%(dMstar,dMstar/dMsun)
+    #CORONAL TEMPERATURE AT t (ISOTHERMAL MODEL)
+    Tc=Tcorona(t,M)
+    if verbose:print "\tTc=%e MK"%(Tc/1E6)
+    #RADIAL VELOCITY
+    vr=VParker(d,M,Tc)
+    if verbose:print "\tvr = %e m/s"%(vr)
+    #NUMBER DENSITY
+    n=dMstar/(4*np.pi*(d*AU)**2*vr*MP)
+    #EFFECTIVE VELOCITY
+    vkep=np.sqrt(GCONST*M*MSUN/(d*AU))
+    if verbose:print "\tvkep = %e m/s"%(vkep)
+    v=np.sqrt(vr**2+vkep**2)
+    if verbose:print "\tn = %e m^-3"%(n)
+    if verbose:print "\tv = %e m/s"%(v)
+
+    return v,n
+
+def binaryWind(a,tau1,M1,R1,tau2,M2,R2,early='constant'):
+    """
+    Stellar wind pressure and particle flux of a binary at distance
+    a (AU).  A component with tau2<=0 is ignored (single star).
+
+    Parameters may be arrays, e.g. the histories of the ages and
+    radii of the components.
+    """
+    v1,n1=vnGreissmeier2(a,tau1,M1,R1,early=early)
+    single=np.array(tau2)<=0
+    if single.all():
+        v2=n2=0
+    else:
+        with np.errstate(invalid='ignore',divide='ignore'):
+            v2,n2=vnGreissmeier2(a,tau2,M2,R2,early=early)
+        v2=np.where(single,0,v2)[()]
+        n2=np.where(single,0,n2)[()]
+    Psw=n1*v1**2+n2*v2**2
+    Fsw=n1*v1+n2*v2
+    return Psw,Fsw
+
+###################################################
+#CALIBRATION PERIOD-RAM PRESSURE RELATIONSHIP
+###################################################
+def calibrationSignature():
+    """
+    MD5 hash of the modules the calibration constants and the
+    coronal temperature table depend on
+    """
+    srcdir=path.dirname(path.abspath(__file__))
+    md5s=[md5file(path.join(srcdir,src)) for src in ("BHM.py","constants.py")]
+    return hashlib.md5("".join(md5s)).hexdigest()
+
+def solarCalibration(cachefile=CALIBCACHE):
+    """
+    Solar wind velocity and density at 1 AU (VSUN, NSUN) and XUV flux
+    at the Earth (PEL, erg cm^-2 s^-1) for the present Sun.
+
+    The constants are read from cachefile when they were computed by
+    the same version of the wind and XUV models; otherwise they are
+    computed and the cache is rewritten.
+    """
+    signature=calibrationSignature()
+    if fileexists(cachefile):
+        try:
+            calib=np.load(cachefile)
+            consts=calib['consts']
+            if (str(calib['signature'])==signature and consts.shape==(3,) and
+                np.isfinite(consts).all() and (consts>0).all()):
+                return consts[0],consts[1],float(consts[2])
+        except Exception:
+            pass
+
+    VSUN,NSUN=vnGreissmeier(1.0,TAGE,1.0,1.0)
+    PEL=starLXUV(1.0,TAGE)/(4*PI*(1*AU*1E2)**2)
+    atomicSave(cachefile,np.savez,signature=signature,consts=np.array([VSUN,NSUN,PEL]))
+    return VSUN,NSUN,PEL
+
+timeMark("numerical modules")
+VSUN,NSUN,PEL=solarCalibration()
+timeMark("wind calibration")
+MDOTSUN=4*PI*(1*AU)**2*MP*NSUN*VSUN
+#print "Solar mass loss: %e kg/s"%(MDOTSUN/MSUN*YEAR)
+#Period-ram pressure relationship (Griessmeier, 2006):
+#Mdot v = ko P^{-3.3}
+KO=(MDOTSUN*VSUN)*(PSUN**3.3)
+
+"""
+Compare with:
+MacGregor & Brenner, 1991
+http://articles.adsabs.harvard.edu//full/1991ApJ...376..204M/0000211.000.html
+"""
+def Prot(t,**pars):
+    """
+    Stellar Rotational Period
+    Consistent with stellar wind model
+    """
+    Ms=pars['Ms']
+    Rs=pars['Rs']
+
+    #Properties of the Solar Wind
+    v,n=vnGreissmeier(1.0,t,Ms,Rs)
+
+    #Mass Loss
+    Mdot=4*PI*(1*AU)**2*MP*n*v
+
+    #Period from the scaling law
+    P=(Mdot*v/KO)**(-1/3.3)
+
+    #print "Ms, t (Gyr), P (day)= ",Ms,t,P/DAY
+    return P
+
+def theoProt(t,x):
+    a=x[0]
+    b=x[1]
+    c=x[2]
+    y=a*t**b+c
+    return y
+
+def dtheoProt(t,x):
+    a=x[0]
+    b=x[1]
+    c=x[2]
+    y=a*b*t**(b-1)
+    return y
+    
+def fitProt(t,P):
+    """
+    Parameters x of theoProt fitted to the rotational periods P at
+    ages t (arrays), minimizing the relative residuals.  The initial
+    guess is the power law (c=0) fitted in log-log.
+    """
+    t=np.array(t,dtype=float)
+    P=np.array(P,dtype=float)
+    b,loga=np.polyfit(np.log(t),np.log(P),1)
+    residuals=lambda x:(theoProt(t,x)-P)/theoProt(t,x)
+    return leastsq(residuals,[np.exp(loga),b,0.0])[0]
+
+def tfromProt(P,x):
+    a=x[0]
+    b=x[1]
+    c=x[2]
+    t=((P-c)/a)**(1./b)
+    return t
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#HABITABILITY ZONE
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#KOPPARAPU ET AL. (2013,2014) COEFFICIENTS S,a,b,c,d OF SEFF
+#2014 RUNAWAY GREENHOUSE DEPENDS ON PLANET MASS (Mp)
+SEFFCOEFS={
+    (2013,"runaway greenhouse"):(1.0385,1.2456E-4,1.4612E-8,-7.6345E-12,-1.7511E-15),
+    (2013,"moist greenhouse"):(1.0146,8.1884E-5,1.9394E-9,-4.3618E-12,-6.8260E-16),
+    (2013,"recent venus"):(1.7763,1.4335E-4,3.3954E-9,-7.6364E-12,-1.1950E-15),
+    (2013,"maximum greenhouse"):(0.3507,5.9578E-5,1.6707E-9,-3.0058E-12,-5.1925E-16),
+    (2013,"early mars"):(0.3207,5.4471E-5,1.5275E-9,-2.1709E-12,-3.8282E-16),
+    (2014,"runaway greenhouse","1.0"):(1.107,1.332E-4,1.58E-8,-8.308E-12,-1.931E-15),
+    (2014,"runaway greenhouse","5.0"):(1.188,1.433E-4,1.707E-8,-8.968E-12,-2.048E-15),
+    (2014,"runaway greenhouse","0.1"):(0.99,1.209E-4,1.404E-8,-7.418E-12,-1.713E-15),
+    #SAME AS 2013
+    (2014,"moist greenhouse"):(1.0146,8.1884E-5,1.9394E-9,-4.3618E-12,-6.8260E-16),
+    #ALL MASSES ARE EQUAL
+    (2014,"recent venus"):(1.776,2.136E-4,2.533E-8,-1.332E-11,-3.097E-15),
+    (2014,"maximum greenhouse"):(0.356,6.171E-5,1.698E-9,-3.198E-12,-5.575E-16),
+    (2014,"early mars"):(0.32,5.547E-5,1.526E-9,-2.874E-12,-5.011E-16),
+}
+#RANGE OF THE FITS
+SEFFTEFF=(2600.0,7200.0)
+
+def seffCoefficients(crit,model=2013,Mp='1.0'):
+    """
+    Coefficients of Seff for criterion crit (see SEFFCOEFS).  Unknown
+    criteria give Seff=-1.
+    """
+    if (model,crit) in SEFFCOEFS:return SEFFCOEFS[model,crit]
+    if (model,crit,Mp) in SEFFCOEFS:return SEFFCOEFS[model,crit,Mp]
+    if model not in (2013,2014):
+        raise Exception("No Seff model %s"%model)
+    if model==2014 and crit=="runaway greenhouse":
+        raise Exception("No runaway greenhouse limit for Mp = %s"%Mp)
+    return None
+
+def Seff(Teff,crits=['recent venus'],model=2013,Mp='1.0',Tsun=TSUN):
+    """
+    Effective fluxes (solar units) at the habitable zone limits crits
+    of a star with effective temperature Teff (K), by Kopparapu et
+    al. 2013 (model=2013) or 2014 (model=2014, Mp is the planet
+    mass, '0.1', '1.0' or '5.0').
+
+    Teff may be an array.  Returns an array (len(crits) x Teff).
+    """
+    Tst=np.clip(np.array(Teff,dtype=float),*SEFFTEFF)-Tsun
+    coefs=[seffCoefficients(crit,model,Mp) or (-1,0,0,0,0) for crit in crits]
+    coefs=np.array(coefs).reshape((len(crits),5)+(1,)*Tst.ndim)
+    S,a,b,c,d=[coefs[:,k] for k in xrange(5)]
+    return S+a*Tst+b*Tst**2+c*Tst**3+d*Tst**4
+
+def Seff2013(Teff,crits=['recent venus'],Tsun=TSUN):
+    """
+    Kopparapu et al., 2013 (see Seff)
+    """
+    Seffs=Seff(Teff,crits=crits,model=2013,Tsun=Tsun)
+    if len(Seffs)==1:return Seffs[0][()]
+    else:return Seffs
+
+def Seff2014(Teff,crits=['recent venus'],Tsun=TSUN,Mp='1.0'):
+    """
+    Kopparapu et al., 2014 (see Seff)
+    """
+    Seffs=Seff(Teff,crits=crits,model=2014,Mp=Mp,Tsun=Tsun)
+    if len(Seffs)==1:return Seffs[0][()]
+    else:return Seffs
+
+def HZ2013(Ls,Teff,lin='recent venus',lout='early mars'):
+    """
+    Habitable Zone limits by Kopparapu et al. (2013)
+    Ls: In solar Units
+    Teff: In K
+    Ls and Teff may be arrays.
+    """
+    return HZ(Ls,Teff,lin=lin,lout=lout,Seff=Seff2013)
+
+def HZ(Ls,Teff,lin='recent venus',lout='early mars',Seff=Seff2013):
+    """
+    Habitable Zone limits by Kopparapu et al. (2013)
+    Ls: In solar Units
+    Teff: In K
+    Ls and Teff may be arrays.
+    """
+    if np.any(np.array(Ls)<0) or np.any(np.array(Teff)<0):
+        raise Exception("Negative value in stellar properties")
+    Seffin,Seffout=Seff(Teff,crits=[lin,lout])
+    Seffsun=1.0
+    lin=(Ls/Seffin)**0.5
+    lout=(Ls/Seffout)**0.5
+    aHZ=(Ls/Seffsun)**0.5
+    return lin,aHZ,lout
+
+def Flux(q,Ls1=1.0,Ls2=1.0,rc1=0.1,rc2=0.1,D=1.0,qsgn=1):
+    R1=np.sqrt(D**2+rc1**2+2*D*rc1*np.sin(q))
+    R2=np.sqrt(D**2+rc2**2-2*D*rc2*np.sin(q))
+    F=qsgn*(Ls1/R1**2+Ls2/R2**2)
+    return F
+
+def AverageFlux(d,Ls1=1.0,Ls2=1.0,rc1=0.1,rc2=0.1,qsgn=1):
+    """
+    Flux (see Flux) averaged over the phase of a circular binary at
+    distance d from its center of mass.  d may be an array.
+
+    The average of 1/(a+b sin q) is 1/sqrt(a^2-b^2), which for
+    a=D^2+rc^2, b=2 D rc is 1/|D^2-rc^2|.
+    """
+    d=np.array(d,dtype=float)
+    F=qsgn*(Ls1/np.abs(d**2-rc1**2)+Ls2/np.abs(d**2-rc2**2))
+    return F[()]
+
+def AverageFluxDistance(S,Ls1=1.0,Ls2=1.0,rc1=0.1,rc2=0.1):
+    """
+    Distance beyond both stars where the average flux (see
+    AverageFlux) is S.  All arguments may be arrays.
+
+    With x=d^2 the condition is the quadratic A x^2 - B x + C = 0,
+    whose largest root is the only one with x > max(rc1^2,rc2^2).
+    S must be positive (Seff is -1 for unknown criteria).
+    """
+    S,Ls1,Ls2,rc1,rc2=[np.array(x,dtype=float) for x in (S,Ls1,Ls2,rc1,rc2)]
+    if np.any(S<=0):
+        raise Exception("Non positive flux S = %s (unknown habitable zone criterion?)"%S[S<=0].flat[0])
+    A=S
+    B=S*(rc1**2+rc2**2)+Ls1+Ls2
+    C=S*rc1**2*rc2**2+Ls1*rc2**2+Ls2*rc1**2
+    x=(B+np.sqrt(B**2-4*A*C))/(2*A)
+    return np.sqrt(x)[()]
+
+def HZbin4(q,Ls1,Ls2,Teffbin,abin,crits=['recent venus','early mars']):
+    """
+    Habitable Zone limits of a circular binary with mass ratio q and
+    separation abin (AU), where the average flux (see AverageFlux) is
+    the effective flux of Kopparapu et al. (2013) for Teffbin.
+
+    Ls1, Ls2 (solar units) and Teffbin may be arrays.
+    """
+    rc2=abin/(q+1)
+    rc1=q*rc2
+    args=dict(Ls1=Ls1,Ls2=Ls2,rc1=rc1,rc2=rc2)
+
+    #EFFECTIVE TEMPERATURES
+    Seffin,Seffout=Seff2013(Teffbin,crits=crits)
+
+    #INNER AND OUTER LIMITS
+    lin=AverageFluxDistance(Seffin,**args)
+    lout=AverageFluxDistance(Seffout,**args)
+
+    aHZ=(lin+lout)/2
+
+    return lin,aHZ,lout
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#ASTRODYNAMICS
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+def aKepler(P,M1,M2,UL=AU,UT=DAY,UM=MSUN):
+    """
+    P: in UT
+    M1,M2: In UM
+    
+    Returns a in UL
+    """
+    a=(((P*UT)**2*GCONST*((M1+M2)*UM))/(4*PI**2))**(1./3.)/UL
+    return a
+
+def PKepler(a,M1,M2,UL=AU,UT=DAY,UM=MSUN):
+    """
+    P: in UT
+    M1,M2: In UM
+    
+    Returns a in UL
+    """
+    P=np.sqrt((a*UL)**3/(GCONST*((M1+M2)*UM)/(4*PI**2)))/UT;
+    return P
+
+#KEPLER EQUATION: TOLERANCE (RAD) AND MAXIMUM NUMBER OF ITERATIONS
+KEPLERTOL=1E-12
+KEPLERMAXITER=50
+
+def keplerEquation(E,**pars):
+    e=pars['e']
+    M=pars['M']
+    ke=E-e*np.sin(E)-M
+    return ke
+
+def eccentricAnomaly(M,e):
+    """
+    Eccentric anomaly E (rad) solving Kepler's equation E - e sin E = M
+    for the mean anomaly M (rad) and eccentricity 0<=e<1.
+
+    M may be an array and take any number of turns.  Newton
+    iterations on M reduced to [-pi,pi], starting at
+    E = M + 0.85 e sign(sin M) (Danby, 1987), converge for all
+    eccentricities.
+    """
+    M=np.array(M,dtype=float)
+    turns=2*PI*np.round(M/(2*PI))
+    M=M-turns
+    E=M+0.85*e*np.sign(np.sin(M))
+    for i in xrange(KEPLERMAXITER):
+        dE=keplerEquation(E,M=M,e=e)/(1-e*np.cos(E))
+        E=E-dE
+        if np.all(np.abs(dE)<=KEPLERTOL):break
+    return (E+turns)[()]
+
+def orbitPositions(t,P,a,e):
+    """
+    Positions (x,y) at times t along Keplerian orbits with periods P
+    (units of t), semimajor axes a and eccentricities e, with the
+    periapsis on x at t=0.
+
+    P, a and e may be arrays of orbits.  Returns an array
+    (len(t) x 2), or (orbits x len(t) x 2).
+    """
+    t=np.array(t,dtype=float)
+    P,a,e=[np.array(x,dtype=float)[...,None] for x in np.broadcast_arrays(P,a,e)]
+    E=eccentricAnomaly(2*PI*t/P,e)
+    x=a*(np.cos(E)-e)
+    y=a*np.sqrt(1-e**2)*np.sin(E)
+    return np.concatenate((x[...,None],y[...,None]),axis=-1)
+
+def binaryOrbits(t,M1,M2,abin,Pbin,e,aps,Pps,eps=0.0):
+    """
+    Positions (AU) at times t of the components of a binary (masses
+    M1, M2, semimajor axis abin, period Pbin and eccentricity e) and
+    of planets orbiting its center of mass (semimajor axes aps,
+    periods Pps and eccentricities eps).  Periods in the units of t.
+
+    Returns r1, r2 (len(t) x 2) and the planets (len(aps) x len(t) x 2).
+    """
+    rred=orbitPositions(t,Pbin,abin,e)
+    r1=M2/(M1+M2)*rred
+    r2=-M1/(M1+M2)*rred
+    rps=orbitPositions(t,Pps,np.atleast_1d(aps),eps)
+    return r1,r2,rps
+
+def binaryInsolation(r1,r2,rps,stars,lamb0,lambinf,lamb1,lamb2):
+    """
+    Insolation (W/m^2, black body between lamb0 and lambinf) and
+    photon flux (photons s^-1 m^-2, between lamb1 and lamb2) on
+    planets at rps (AU) from the components of a binary at r1, r2
+    (see binaryOrbits), with radii and temperatures stars=((R1,T1),
+    (R2,T2)) in solar units and K.
+
+    Returns the insolations and photon fluxes from each component
+    (2 x shape of rps without the last axis).
+    """
+    F=[];N=[]
+    for (R,T),r in zip(stars,(r1,r2)):
+        d=np.sqrt(((r-rps)**2).sum(axis=-1))
+        dilution=(R*RSUN/(d*AU))**2
+        F+=[planckPower(lamb0,lambinf,T)*dilution]
+        N+=[planckPhotons(lamb1,lamb2,T)*dilution]
+    return np.array(F),np.array(N)
+
+def aCritical(mu,a,e):
+    ac=(1.6+(5.1*e)-(2.22*e**2)+(4.12*mu)-(4.27*e*mu)-(5.09*mu**2)+(4.61*e**2*mu**2))*a
+    return ac
+
+def eCritical(mu,abin,a):
+    ecrit=lambda x:aCritical(mu,abin,x)-a
+    e=bisectFunction(ecrit,0.0,1.0)
+    if e<0:e=1
+    return e
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#TIDAL INTERACTION
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+def nSync(e):
+    """
+    Ratio Omega/n for a pseudosynchronised body (Hut, 1981)
+    """
+    nsync=(1+15./2*e**2+45./8*e**4+5./16*e**6)/\
+        ((1+3*e**2+3./8*e**4)*(1-e**2)**1.5)
+    return nsync
+
+def tidalAcceleration(Mtarg,Rtarg,Ltarg,Mfield,abin,e,n,Omega,verbose=False):
+    """
+    Tidal acceleration on star Mtarg,Rtarg,Ltarg (in solar units) due
+    to body Mfield when body is rotating with angular velocity Omega
+    in an orbit with semimajor axis abin (AU), eccentricity e and mean
+    angular velocity n (same units as Omega)
+    
+    Returns angular velocity 
+    """
+    if verbose:print "*"*50
+    if verbose:print "HUT"
+    if verbose:print "abin:",abin
+
+    #Eccentricity function
+    f2=1+(15./2.)*e**2+(45./8.)*e**4+(5./16.)*e**6
+    f5=1+3*e**2+(3./8.)*e**4
+    if verbose:print "f1,f5:",f2,f5
+
+    #Maximum rotational rate
+    Omega_min=n*f2/((1-e**2)**1.5*f5)
+
+    #Zahn (2008) DISSIPATION TIME
+    tdiss=3.48*((Mtarg*MSUN*(Rtarg*RSUN)**2)/(Ltarg*LSUN))**(1./3)
+    kdiss=1/tdiss
+
+    if verbose:print "tdiss:",tdiss
+    if verbose:print "n,Omega:",n,Omega
+    if verbose:print "e:",e
+
+    #Radius of gyration
+    rg2=stellarMoI(Mtarg)
+    if verbose:print "Radius of Gyration:",rg2
+
+    #Angular acceleration
+    angacc=kdiss/rg2*(Mfield/Mtarg)**2*((Rtarg*RSUN)/(abin*AU))**6*(n/(1-e**2)**6)*(f2-(1-e**2)**1.5*f5*Omega/n)
+    if verbose:print "Factors:",Omega/n,f2/((1-e**2)**1.5*f5)
+    if verbose:print "Acc:",angacc
+
+    return angacc
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#SPIN EVOLUTION
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#RELATIVE ACCURACY OF THE INTEGRATED ANGULAR VELOCITIES
+SPINRTOL=1E-8
+#LAG BEHIND THE TIDAL EQUILIBRIUM ALLOWED TO A LOCKED BODY (RELATIVE)
+SPINLOCKTOL=1E-6
+#A LOCK IS BROKEN WHEN THE LAG EXCEEDS SPINUNLOCK*SPINLOCKTOL
+SPINUNLOCK=10
+#ITERATIONS OF THE TIDAL EQUILIBRIUM
+SPINLOCKITER=3
+#NUMBER OF OUTPUT AGES INTEGRATED BEFORE CHECKING LOCKS
+SPINCHUNK=100
+
+def spinDerivatives(tau,W,tracks,Ms,abin,e,n,xfits,components=(0,1)):
+    """
+    Right hand side of the spin evolution of the components of a
+    binary: tidal acceleration plus the braking due to mass-loss, as
+    given by the fit of theoProt (xfits) at the rotational age.
+
+    Parameters:
+    tau: age in Gyr
+    W: angular velocities of the components in rad/s
+    tracks: evolutionary tracks of the components (see StellarTrack)
+    Ms: masses of the components (Msun)
+    abin,e,n: semimajor axis (AU), eccentricity and mean angular
+              velocity (rad/s) of the binary
+    components: components whose angular velocities are in W (the
+                spins of the components evolve independently)
+
+    tau may be an array, in which case W has shape
+    (len(components),len(tau)).
+
+    Return:
+    Total, tidal and mass-loss accelerations (rad/s^2) and rotational
+    ages (Gyr) of the components
+    """
+    acc=[];acc_tid=[];acc_ML=[];tau_rot=[]
+    for j,i in enumerate(components):
+        g,T,R,L=tracks[i](tau)
+        tid=tidalAcceleration(Ms[i],R,L,Ms[1-i],abin,e,n,W[j])
+        P=2*np.pi/W[j]
+        trot=tfromProt(P/DAY,xfits[i])
+        ML=-2*np.pi/P**2*dtheoProt(trot,xfits[i])*DAY/GYR
+        acc+=[tid+ML];acc_tid+=[tid];acc_ML+=[ML];tau_rot+=[trot]
+    return np.array(acc),np.array(acc_tid),np.array(acc_ML),np.array(tau_rot)
+
+def spinEquilibrium(tau,tracks,Ms,abin,e,n,xfits,niter=SPINLOCKITER):
+    """
+    Angular velocities (rad/s) at which the tides of the components
+    of a binary (see spinDerivatives) balance their braking at ages
+    tau (Gyr).
+
+    The tidal acceleration is k*(Wsync-W), with Wsync=nSync(e)*n the
+    pseudo-synchronous rate, so the equilibrium is
+    Wsync+acc_ML(W)/k, solved by fixed point iteration from Wsync.
+
+    Returns the equilibria and the tidal relaxation rates k (1/s),
+    both with shape (2,len(tau)).
+    """
+    Wsync=nSync(e)*n
+    k=[]
+    for i in 0,1:
+        g,T,R,L=tracks[i](tau)
+        k+=[tidalAcceleration(Ms[i],R,L,Ms[1-i],abin,e,n,0.0)/Wsync]
+    k=np.array(k)
+    Weq=Wsync*np.ones_like(k)
+    with np.errstate(all='ignore'):
+        for it in xrange(niter):
+            acc,acc_tid,acc_ML,tau_rot=spinDerivatives(tau,Weq,tracks,Ms,abin,e,n,xfits)
+            Weq=Wsync+acc_ML/k
+    return Weq,k
+
+def spinEvolution(tau0,Wo,taus,tracks,Ms,abin,e,n,xfits,rtol=SPINRTOL):
+    """
+    Angular velocities (rad/s) at ages taus (Gyr) of the components of
+    a binary with angular velocities Wo at tau0 (see spinDerivatives).
+
+    The equations are integrated with LSODA, which adapts the step to
+    rtol and switches to a stiff method when tidal synchronization is
+    fast, so the cost does not scale with the synchronization time.
+
+    A component whose rotation has relaxed to the tidal equilibrium
+    (see spinEquilibrium) is locked: it leaves the integration and
+    follows the equilibrium.  This holds while the equilibrium moves
+    slowly compared with the tidal relaxation, i.e. while the lag
+    |dWeq/dt|/k is below SPINLOCKTOL (relative to nSync(e)*n); the
+    lock is broken, and the component integrated again, once the
+    braking makes the lag SPINUNLOCK times larger.  Locks are checked
+    at the output ages, every SPINCHUNK of them, and the integration
+    restarts at the age where any of them changes.
+
+    Returns the angular velocities and the locks (arrays len(taus) x
+    2).
+    """
+    Wsync=nSync(e)*n
+    atol=rtol*np.abs(Wo).min()
+    W=np.array(Wo,dtype=float)
+    Ws=np.zeros((len(taus),2))
+    Ls=np.zeros((len(taus),2),dtype=bool)
+    locked=np.array([False,False])
+    tau=tau0
+    i=0
+    while i<len(taus):
+        ages=taus[i:i+SPINCHUNK]
+        Weq,k=spinEquilibrium(np.append([tau],ages),tracks,Ms,abin,e,n,xfits)
+
+        #LOCKED COMPONENTS FOLLOW THE EQUILIBRIUM
+        Wseg=Weq[:,1:].T.copy()
+        free=[c for c in (0,1) if not locked[c]]
+        if free:
+            rhs=lambda W,tau:spinDerivatives(tau,W,tracks,Ms,abin,e,n,xfits,free)[0]*GYR
+            Wseg[:,free]=odeint(rhs,W[free],np.append([tau],ages),rtol=rtol,atol=atol)[1:]
+
+        #LAG OF THE ROTATION BEHIND THE EQUILIBRIUM
+        with np.errstate(all='ignore'):
+            lag=np.abs(np.gradient(Weq,np.append([tau],ages)*GYR,axis=1)/k)[:,1:]/Wsync
+            dev=np.abs(Wseg.T-Weq[:,1:])/Wsync
+            locks=np.where(locked[:,None],lag<=SPINUNLOCK*SPINLOCKTOL,
+                           (dev<=SPINLOCKTOL)&(lag<=SPINLOCKTOL))
+
+        #FIRST AGE WHERE A LOCK CHANGES
+        flips=np.where((locks!=locked[:,None]).any(axis=0))[0]
+        m=flips[0] if len(flips) else len(ages)-1
+        Ws[i:i+m+1]=Wseg[:m+1]
+        Ls[i:i+m+1]=locked
+        if len(flips):
+            locked=locks[:,m]
+            Ws[i+m,locked]=Weq[locked,m+1]
+            Ls[i+m]=locked
+        tau=ages[m];W=Ws[i+m].copy()
+        i+=m+1
+    return Ws,Ls
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#PLANCK DISTRIBUTION
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+def planckDistrib(lamb,T):
+    B=2*HP*CSPEED**2/(lamb**5)/(np.exp(HP*CSPEED/(KB*T*lamb))-1)
+    I=np.pi*B
+    return I
+
+def planckPhotonDistrib(lamb,T):
+    B=2*HP*CSPEED**2/(lamb**5)/(np.exp(HP*CSPEED/(KB*T*lamb))-1)
+    J=np.pi*B/(HP*CSPEED/lamb)
+    return J
+
+def planckPower(lamb1,lamb2,T):
+    R,dR=integrate(planckDistrib,lamb1,lamb2,args=(T,))
+    return R
+
+def planckPhotons(lamb1,lamb2,T):
+    N,dN=integrate(planckPhotonDistrib,lamb1,lamb2,args=(T,))
+    return N
+
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#DERIVED CONSTANTS
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#XUV Present Earth Level in erg cm^-2 s^-1 (PEL, see solarCalibration)
+#XUV IN SI
+PELSI=PEL*(1E-7/(1E-2))
+
@@ -0,0 +1,41 @@
+from util import *
+from os import getuid
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#ISOCHRONE CONFIGURATION
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+ISODIR="BHM/data/PADOVA/"
+ISOCACHEDIR="BHM/data/PADOVA/cache/"
+#INCREASE WHEN THE LAYOUT OF THE BINARY CACHE CHANGES
+ISOCACHE_VERSION=2
+#SHARE LOADED ISOCHRONES AMONG PROCESSES OF THE SAME USER
+ISOSTORE=True
+if path.isdir("/dev/shm"):
+    ISOSTOREDIR="/dev/shm/BHM-isochrones-%d/"%getuid()
+else:
+    ISOSTOREDIR=ISOCACHEDIR+"store/"
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+#CACHES OF DERIVED QUANTITIES
+#%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+CACHEDIR="BHM/data/cache/"
+CALIBCACHE=CACHEDIR+"calibration.npz"
+TCORONACACHE=CACHEDIR+"tcorona.npz"
+#PRINT A STARTUP TIME BREAKDOWN (ENVIRONMENT VARIABLE BHMTIMING)
+TIMING=environ.get("BHMTIMING","0") not in ("","0")
+ZSVEC_full=np.array([
+        0.0001,0.0002,0.0004,0.0006,0.0008,
+        0.0010,0.0020,0.0030,0.0040,0.0050,0.0060,0.0070,0.0080,0.0090,
+        0.0100,0.0125,0.0150,0.0175,
+        0.0200,0.0225,0.0250,0.0275,
+        0.0300,0.0325,0.0350,0.0375,
+        0.0400,0.0425,0.0450,0.0475,
+        0.0500,0.0525,0.0550,0.0575,
+        0.0600
+        ])
+ZSVEC_coarse=np.array([0.0001,0.0010,0.0050,0.0100,0.0152,0.0200,0.0300,0.0400,0.0500,0.0600])
+ZSVEC_siblings=np.array([0.0100,0.0152,0.0200])
+ZSVEC_solar=np.array([0.0152])
+#ISOCHRONE SETS BY NAME (zsvec ARGUMENT OF BHMcalc.py)
+ZSVECS=dict(ZSVEC_full=ZSVEC_full,
+            ZSVEC_coarse=ZSVEC_coarse,
+            ZSVEC_siblings=ZSVEC_siblings,
+            ZSVEC_solar=ZSVEC_solar)
@@ -0,0 +1,31 @@
+from BHM import *
+from scipy.optimize import brentq
+
+"""
+Regression check of eccentricAnomaly against a scalar root solve of
+Kepler's equation E - e sin E = M.  Usage (from the BHMcalc
+directory):
+
+  python BHM/testKepler.py
+"""
+TOL=1E-10
+
+#MEAN ANOMALIES OF SEVERAL TURNS, BOTH SIGNS
+Ms=np.linspace(-4*PI,6*PI,1001)
+for e in 0.0,0.5,0.99:
+    Es=eccentricAnomaly(Ms,e)
+    #|E-M|<=e SO THE ROOT IS INSIDE [M-1,M+1]
+    Eref=np.array([brentq(lambda E:E-e*np.sin(E)-M,M-1,M+1,xtol=1E-14)
+                   for M in Ms])
+    err=np.abs(Es-Eref).max()
+    res=np.abs(Es-e*np.sin(Es)-Ms).max()
+    print "e = %.2f: max |E-Eref| = %.1e, max |E-e sin E-M| = %.1e"%(e,err,res)
+    if err>TOL or res>TOL:
+        raise Exception("eccentricAnomaly does not solve Kepler's equation for e = %.2f"%e)
+
+    #SCALAR CALLS
+    for M in Ms[::100]:
+        E=eccentricAnomaly(M,e)
+        if abs(E-e*np.sin(E)-M)>TOL:
+            raise Exception("eccentricAnomaly(%f,%.2f) = %f is not a solution"%(M,e,E))
+print "eccentricAnomaly OK"
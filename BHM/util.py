@@ -0,0 +1,154 @@
+import hashlib
+import numpy as np
+from sys import exit,stderr,stdout,argv
+from os import system,path,environ,getpid,rename,remove
+from time import time
+import commands
+try:
+    from scipy.optimize import minimize
+except:
+    from scipy.optimize import fmin
+    def minimize(f,xo,**args):
+        s=dict()
+        s['x']=fmin(f,xo,disp=False)
+        return dict2obj(s)
+
+######################################################################
+#MACROS
+######################################################################
+fileexists=path.isfile
+MD5=hashlib.md5()
+def md5str(str):
+    MD5.update(str)
+    return MD5.hexdigest()
+
+def md5file(filename,blocksize=2**20):
+    """
+    MD5 hash of the contents of a file
+    """
+    md5=hashlib.md5()
+    fl=open(filename,"rb")
+    block=fl.read(blocksize)
+    while block:
+        md5.update(block)
+        block=fl.read(blocksize)
+    fl.close()
+    return md5.hexdigest()
+
+######################################################################
+#TIMING
+######################################################################
+TIMEMARKS=[("start",time())]
+def timeMark(label):
+    """
+    Record the time at which a startup step ends
+    """
+    TIMEMARKS.append((label,time()))
+
+def timeReport(out=stderr):
+    """
+    Print the time spent in each step recorded with timeMark
+    """
+    print>>out,"Time breakdown:"
+    for (label0,t0),(label,t) in zip(TIMEMARKS[:-1],TIMEMARKS[1:]):
+        print>>out,"\t%-30s %8.3f s"%(label,t-t0)
+    print>>out,"\t%-30s %8.3f s"%("total",TIMEMARKS[-1][1]-TIMEMARKS[0][1])
+
+######################################################################
+#UTILITY ROUTINES
+######################################################################
+class dict2obj(object):
+    """Object like dictionary
+    
+    Parameters:
+    ----------
+    dict:
+       Dictionary with the attributes of object
+    
+    Examples:
+    --------
+    >>> c=dictobj({'a1':0,'a2':1})
+    
+    Addition:
+
+    >>> c+=dictobj({'a3':2})
+
+    """
+    def __init__(self,dic={}):self.__dict__.update(dic)
+    def __add__(self,other):
+        for attr in other.__dict__.keys():
+            exec("self.%s=other.%s"%(attr,attr))
+        return self
+
+def printerr(str):
+    print >>stderr,str
+
+######################################################################
+#NUMERICAL ROUTINES
+######################################################################
+def bisectFunction(fsw,a,b,maxiter=20,tol=1E-3,**pars):
+    """
+    Bisection algorithm
+    """
+    eps=1.0;
+    i=0
+    f1=fsw(b,**pars)
+    f2=fsw(a,**pars)
+    if f1*f2>0:
+        #print "Bisection failed. f1 = %e, f2 = %e No zero in the interval (%e,%e)"%(f1,f2,a,b)
+        return -1
+
+    while eps>tol and i<maxiter:
+        m=a+(b-a)/2.
+        f1=fsw(a,**pars)
+        fm=fsw(m,**pars)
+        f2=fsw(b,**pars)
+        if f1*fm<0:b=m
+        else:a=m
+        eps=abs(b-a)/abs(a+b)
+        i=i+1
+
+    return m
+
+def scaleProp(m,alpha,beta):
+    """
+    Scaling function
+    """
+    return alpha*m**beta
+
+def System(cmd,out=False,sim=False):
+    """
+    Execute a command
+    """
+    if sim:return ""
+    if not out:
+        system(cmd)
+        output=""
+    else:
+        output=commands.getoutput(cmd)
+    return output
+
+def atomicSave(filename,save,*args,**kwargs):
+    """
+    Write filename with save(file,*args,**kwargs) (e.g. np.savez) into
+    a temporary file renamed at the end, so concurrent readers never
+    see a partial file.  Returns False if it could not be written.
+    """
+    ftmp=filename+".%d"%getpid()
+    try:
+        dirname=path.dirname(filename)
+        if dirname and not path.isdir(dirname):
+            System("mkdir -p %s"%dirname)
+        fl=open(ftmp,"wb")
+        try:
+            save(fl,*args,**kwargs)
+        finally:
+            fl.close()
+        rename(ftmp,filename)
+    except (IOError,OSError):
+        if path.isfile(ftmp):remove(ftmp)
+        return False
+    return True
+
+def D2R(angle):return angle*np.pi/180
+def R2D(angle):return angle*180/np.pi
@@ -0,0 +1,173 @@
+from BHM.isochrones import *
+from BHM.plot import *
+from BHM.BHM import *
+from BHM.catalogue import *
+from BHMcalc import computeSystem,systemParameters
+import os,re,socket,signal,json
+
+"""
+Usage:
+
+  python BHMdaemon.py [nworkers] [socket]
+
+Preforked BHMcalc server.  Imports, the wind calibration of BHM.BHM
+and the isochrone sets offered by the interface are loaded once in
+the master process, which then forks nworkers workers (default 4)
+sharing that state copy-on-write.
+
+Workers accept jobs on the Unix socket (default
+tmp/BHMdaemon.sock).  A job is a single line with a JSON list of the
+20 command line arguments of BHMcalc.py; the reply is a line with
+the JSON object {"status":<exit status>}.  Each job calls
+computeSystem in a child of the worker, with its standard output and error sent to
+tmp/fulloutput-<sessid>.log as index.php does, so the outputs are the
+same as those of a cold run.  Jobs for an isochrone set not in PRELOAD
+or with a session id that is not a PHP session id are rejected with
+{"status":-1,"error":<message>} before being started.  The master
+replaces workers that die.
+
+Must be started from the BHMcalc directory.
+"""
+
+############################################################
+#CONFIGURATION
+############################################################
+TMPDIR="tmp/"
+DAEMONSOCKET=TMPDIR+"BHMdaemon.sock"
+NWORKERS=4
+NARGS=20
+#ISOCHRONE SETS OFFERED BY index.php
+PRELOAD=['ZSVEC_siblings','ZSVEC_coarse','ZSVEC_full']
+#SESSION IDS ARE PHP SESSION IDS (THEY ARE PART OF OUTPUT FILE NAMES)
+SESSID=re.compile(r"^[A-Za-z0-9,-]+$")
+
+############################################################
+#ROUTINES
+############################################################
+def preload(verbose=True):
+    """
+    Load once everything a BHMcalc run needs before forking
+    """
+    for zsvec in PRELOAD:
+        if verbose:print "Preloading %s..."%zsvec
+        loadIsochroneSet(Zs=ZSVECS[zsvec],lazy=False,props=GTRLPROPS)
+    plt.close("all")
+
+def runJob(args):
+    """
+    Compute the system with BHMcalc.py arguments args in a child
+    process and return its exit status
+    """
+    pid=os.fork()
+    if pid==0:
+        status=0
+        try:
+            params=systemParameters(args)
+            fout=open(TMPDIR+"fulloutput-%s.log"%params['sessid'],"w")
+            os.dup2(fout.fileno(),1)
+            os.dup2(fout.fileno(),2)
+            computeSystem(params)
+        except SystemExit as error:
+            status=error.code or 0
+        except:
+            import traceback
+            traceback.print_exc()
+            status=1
+        stdout.flush()
+        stderr.flush()
+        os._exit(status)
+    pid,status=os.waitpid(pid,0)
+    return os.WEXITSTATUS(status)
+
+def serveJobs(server):
+    """
+    Worker loop
+    """
+    signal.signal(signal.SIGTERM,signal.SIG_DFL)
+    while True:
+        conn,address=server.accept()
+        fl=None
+        try:
+            fl=conn.makefile("rw")
+            args=json.loads(fl.readline())
+            if len(args)!=NARGS:
+                raise ValueError("%d arguments expected"%NARGS)
+            args=[str(arg) for arg in args]
+            params=systemParameters(args)
+            #ONLY THE PRELOADED ISOCHRONE SETS ARE SERVED
+            if params['zsvec'] not in PRELOAD:
+                raise ValueError("Isochrone set '%s' is not available"%params['zsvec'])
+            if not SESSID.match(params['sessid']):
+                raise ValueError("Invalid session id '%s'"%params['sessid'])
+            reply=dict(status=runJob(args))
+        except Exception as error:
+            reply=dict(status=-1,error=str(error))
+        try:
+            if fl is not None:
+                fl.write(json.dumps(reply)+"\n")
+                fl.close()
+        except IOError:
+            #THE CLIENT IS GONE
+            pass
+        conn.close()
+
+def startWorker(server):
+    pid=os.fork()
+    if pid==0:
+        try:
+            serveJobs(server)
+        finally:
+            os._exit(0)
+    return pid
+
+def submitJob(args,sockfile=DAEMONSOCKET):
+    """
+    Send a job to a running daemon and wait for its exit status
+    """
+    client=socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+    client.connect(sockfile)
+    fl=client.makefile("rw")
+    fl.write(json.dumps([str(arg) for arg in args])+"\n")
+    fl.flush()
+    reply=json.loads(fl.readline())
+    fl.close()
+    client.close()
+    return reply['status']
+
+############################################################
+#MAIN
+############################################################
+if __name__=="__main__":
+    nworkers=NWORKERS
+    sockfile=DAEMONSOCKET
+    if len(argv)>1:nworkers=int(argv[1])
+    if len(argv)>2:sockfile=argv[2]
+
+    preload()
+
+    if path.exists(sockfile):os.remove(sockfile)
+    server=socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+    server.bind(sockfile)
+    os.chmod(sockfile,0o770)
+    server.listen(64)
+
+    workers=[startWorker(server) for i in xrange(nworkers)]
+    print "BHMcalc daemon listening on %s with %d workers"%(sockfile,nworkers)
+    stdout.flush()
+
+    def stopDaemon(signum,frame):
+        for pid in workers:
+            try:os.kill(pid,signal.SIGTERM)
+            except OSError:pass
+        if path.exists(sockfile):os.remove(sockfile)
+        exit(0)
+    signal.signal(signal.SIGTERM,stopDaemon)
+    signal.signal(signal.SIGINT,stopDaemon)
+
+    #REAP AND REPLACE WORKERS THAT DIE
+    while True:
+        pid,status=os.wait()
+        if pid in workers:
+            print "Worker %d died (status %d), starting a new one"%(pid,status)
+            stdout.flush()
+            workers[workers.index(pid)]=startWorker(server)
@@ -109,6 +109,35 @@ function generateRandomString($length = 10) {
   return $randomString;
 }
 
+function runDaemon($args,&$error){
+  //HAND THE JOB TO A RUNNING BHMdaemon.py, IF ANY.  RETURNS FALSE
+  //ONLY IF THE JOB WAS NOT STARTED, SO THAT IT CAN BE RUN HERE
+  $error="";
+  $sockfile="tmp/BHMdaemon.sock";
+  if(!file_exists($sockfile)){return false;}
+  $sock=@stream_socket_client("unix://$sockfile",$errno,$errstr,5);
+  if(!$sock){return false;}
+  stream_set_timeout($sock,3600);
+  $line=json_encode($args)."\n";
+  if(fwrite($sock,$line)!==strlen($line)){fclose($sock);return false;}
+  $answer=fgets($sock);
+  $meta=stream_get_meta_data($sock);
+  fclose($sock);
+  //NO ANSWER: THE DAEMON MAY STILL BE RUNNING THE JOB
+  if($answer===false){
+    $error=$meta["timed_out"]?"the calculation timed out":"the calculation server closed the connection";
+    return true;
+  }
+  $reply=json_decode($answer,true);
+  if($reply===null){
+    $error="invalid answer from the calculation server";
+    return true;
+  }
+  //JOB REJECTED BEFORE BEING STARTED
+  if($reply["status"]<0){return false;}
+  return true;
+}
+
 function ajaxForm($buttonid,$formid,$resultid){
   //Taken from: http://hayageek.com/examples/jquery/ajax-form-submit/index.php
 $ajaxform=<<<AJAXFORM
@@ -314,7 +343,13 @@ if(isset($submit) and !isset($back)){
   if(!isset($reload) and !isset($load) and !isset($save) and !isset($delete)){
     $cmd="$PYTHONCMD BHMcalc.py $Z $M1 $M2 $e $Pbin $tau $Mp $ap $tautot $qintegration $sessid $zsvec $qchz $earlywind $FeH $ep \"$incrit\" \"$outcrit\" \"$confname\" $qsaved &> tmp/fulloutput-$sessid.log";
     //echo "<p>$cmd</p>";return;
-    exec($cmd,$output,$status); 
+    $args=array($Z,$M1,$M2,$e,$Pbin,$tau,$Mp,$ap,$tautot,$qintegration,$sessid,$zsvec,$qchz,$earlywind,$FeH,$ep,$incrit,$outcrit,$confname,$qsaved);
+    if(!runDaemon($args,$error)){exec($cmd,$output,$status);}
+    if($error){
+      echo "<P STYLE='color:red'>An error has occurred while executing the program: $error</P>";
+      echo "<a href=?back&$qstring>Back</a>";
+      return;
+    }
     shell_exec("echo '$cmd' > tmp/cmd-$sessid.log");
     $qreload="reload&$qstring";
   }else if(isset($reload)){